@@ -1,12 +1,13 @@
 import click
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Iterable, Dict, Any
+import itertools
 import json
+import textwrap
 from pathlib import Path
 
 from database import db_manager
-from models import SpectrumData, ConfigInfo
-from ndjson_migrator import NDJSONMigrator
+from ndjson_migrator import NDJSONMigrator, DEFAULT_WORKERS
 
 @click.group()
 def cli():
@@ -47,7 +48,9 @@ def stats():
               help='Batch size for processing')
 @click.option('--pattern', '-p', default="*.ndjson", 
               help='File pattern for directory processing')
-def migrate(input_path: str, batch_size: int, pattern: str):
+@click.option('--workers', '-w', default=DEFAULT_WORKERS, 
+              help='Number of files to migrate in parallel')
+def migrate(input_path: str, batch_size: int, pattern: str, workers: int):
     """Migrate NDJSON files to TimescaleDB"""
     
     input_path = Path(input_path)
@@ -64,12 +67,31 @@ def migrate(input_path: str, batch_size: int, pattern: str):
             total_inserted = migrator.migrate_file(input_path)
         else:
             click.echo(f"🔄 Migrating directory: {input_path}")
-            total_inserted = migrator.migrate_directory(input_path, pattern)
+            total_inserted = migrator.migrate_directory(input_path, pattern, workers=workers)
         
         click.echo(f"✅ Migration completed! Records inserted: {total_inserted}")
         
     except Exception as e:
         click.echo(f"❌ Migration failed: {e}", err=True)
+        return
+    
+    # Rows are already committed; a failed refresh only leaves stats stale
+    try:
+        db_manager.refresh_statistics()
+    except Exception as e:
+        click.echo(f"⚠️  Statistics refresh failed, stats may be stale: {e}", err=True)
+
+def _write_json_array(output_path: Path, records: Iterable[Dict[str, Any]]) -> int:
+    """Write records as an indented JSON array one record at a time"""
+    count = 0
+    with open(output_path, 'w') as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n" if count else "\n")
+            f.write(textwrap.indent(json.dumps(record, indent=2, default=str), "  "))
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
 
 @cli.command()
 @click.option('--start-time', '-s', help='Start time (YYYY-MM-DD HH:MM:SS)')
@@ -93,25 +115,26 @@ def query(start_time: Optional[str], end_time: Optional[str],
             end_dt = datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S")
         
         click.echo("🔍 Querying spectrum data...")
-        results = db_manager.query_spectrum_data(
+        records = db_manager.iter_spectrum_data(
             start_time=start_dt,
             end_time=end_dt,
             instance_name=instance,
             limit=limit
         )
         
-        if not results:
+        first = next(records, None)
+        if first is None:
             click.echo("📭 No data found matching the criteria")
             return
         
         if output:
-            # Save to file
+            # Stream to file without holding the full result set in memory
             output_path = Path(output)
-            with open(output_path, 'w') as f:
-                json.dump(results, f, indent=2, default=str)
-            click.echo(f"💾 Results saved to {output_path}")
+            count = _write_json_array(output_path, itertools.chain([first], records))
+            click.echo(f"💾 {count} results saved to {output_path}")
         else:
             # Display in console
+            results = [first, *records]
             click.echo(f"\n📋 Found {len(results)} records:")
             click.echo("─" * 80)
             
@@ -139,7 +162,7 @@ def recent(days: int, instance: Optional[str]):
     """Show recent spectrum data"""
     
     try:
-        end_time = datetime.now()
+        end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(days=days)
         
         click.echo(f"🕒 Showing data from last {days} days...")
@@ -1,10 +1,16 @@
 import os
+import re
 from dotenv import load_dotenv
-from pydantic import BaseSettings
-from typing import Optional
+from pydantic import BaseSettings, validator
 
 load_dotenv()
 
+# PostgreSQL interval as one or more '<number> <unit>' pairs, e.g. '1 day' or '1 day 12 hours'
+_INTERVAL_PATTERN = re.compile(
+    r"^\s*(\d+\s*(microseconds?|milliseconds?|seconds?|minutes?|hours?|days?|weeks?|months?|years?)\s*)+$",
+    re.IGNORECASE
+)
+
 class DatabaseConfig(BaseSettings):
     """Database configuration settings"""
     
@@ -15,9 +21,25 @@ class DatabaseConfig(BaseSettings):
     username: str = os.getenv("TIMESCALE_USER", "postgres")
     password: str = os.getenv("TIMESCALE_PASSWORD", "")
     
+    # Hypertable settings
+    chunk_time_interval: str = os.getenv("TIMESCALE_CHUNK_INTERVAL", "1 day")
+    compress_after: str = os.getenv("TIMESCALE_COMPRESS_AFTER", "7 days")
+    
     # Connection pool settings
     pool_size: int = 10
     max_overflow: int = 20
+    # Idle raw psycopg2 connections kept open for reuse between calls
+    min_pool_size: int = int(os.getenv("TIMESCALE_MIN_POOL_SIZE", "1"))
+    
+    # Rows per INSERT statement when not using COPY
+    insert_page_size: int = int(os.getenv("TIMESCALE_INSERT_PAGE_SIZE", "500"))
+    
+    @validator('chunk_time_interval', 'compress_after', always=True)
+    def validate_interval(cls, v):
+        """Ensure interval settings are plain PostgreSQL intervals"""
+        if not _INTERVAL_PATTERN.match(v):
+            raise ValueError(f"Invalid interval: {v!r} (expected e.g. '1 day' or '12 hours')")
+        return v.strip()
     
     @property
     def connection_string(self) -> str:
@@ -1,27 +1,181 @@
+import atexit
+import io
+import itertools
+import json
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import operator
+import struct
+import threading
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from contextlib import contextmanager
 import psycopg2
-from psycopg2.extras import RealDictCursor, execute_values
+import psycopg2.errors
+from psycopg2.extras import RealDictCursor, Json, execute_values
+from psycopg2.extensions import connection as PGConnection
+from psycopg2.pool import ThreadedConnectionPool
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
-import json
+import orjson
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python 3.8
+    from backports.zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from config import db_config
-from models import SpectrumData, ConfigInfo
+from models import SpectrumData
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prepared rows sort by (scan_time, instance_name) so each chunk is written contiguously
+_ROW_ORDER = operator.itemgetter(1, 2)
+
+_UPSERT_COLUMNS = "id, scan_time, instance_name, cf, span, sample_amount, rbw, vbw, config_extra"
+
+_ON_CONFLICT_SQL = """
+ON CONFLICT (scan_time, id) DO UPDATE SET
+    instance_name = EXCLUDED.instance_name,
+    cf = EXCLUDED.cf,
+    span = EXCLUDED.span,
+    sample_amount = EXCLUDED.sample_amount,
+    rbw = EXCLUDED.rbw,
+    vbw = EXCLUDED.vbw,
+    config_extra = EXCLUDED.config_extra
+"""
+
+# Per-session staging table: concurrent migrations never share rows, and
+# rows vanish at commit so no TRUNCATE is needed between batches
+_CREATE_STAGING_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS spectrum_data_staging
+(LIKE spectrum_data INCLUDING DEFAULTS)
+ON COMMIT DELETE ROWS
+"""
+
+_COPY_STAGING_SQL = f"COPY spectrum_data_staging ({_UPSERT_COLUMNS}) FROM STDIN WITH (FORMAT BINARY)"
+
+_MERGE_STAGING_SQL = f"""
+INSERT INTO spectrum_data ({_UPSERT_COLUMNS})
+SELECT {_UPSERT_COLUMNS} FROM spectrum_data_staging
+{_ON_CONFLICT_SQL}
+"""
+
+_QUERY_SELECT = """
+SELECT id, scan_time, instance_name, cf, span, sample_amount, 
+       rbw, vbw, config_extra, created_at
+FROM spectrum_data
+"""
+
+# Optional query_spectrum_data filters as (parameter name, condition template)
+_QUERY_FILTERS = (
+    ('start_time', "scan_time >= {}"),
+    ('end_time', "scan_time <= {}"),
+    ('instance_name', "instance_name = {}"),
+)
+
+def _build_query_variants() -> Dict[Tuple[bool, ...], Tuple[str, str, str, Tuple[str, ...]]]:
+    """Precompute (statement name, prepared SQL, cursor SQL, parameter order) per filter combination"""
+    def render(active, placeholder):
+        conditions = [template.format(placeholder(i)) for i, (_, template) in enumerate(active, 1)]
+        where = f"WHERE {' AND '.join(conditions)}\n" if conditions else ""
+        return f"{_QUERY_SELECT}{where}ORDER BY scan_time DESC LIMIT {placeholder(len(active) + 1)}"
+    
+    variants = {}
+    for enabled in itertools.product((False, True), repeat=len(_QUERY_FILTERS)):
+        active = [f for f, on in zip(_QUERY_FILTERS, enabled) if on]
+        
+        name = "spectrum_query_" + "".join("1" if on else "0" for on in enabled)
+        # Server-side PREPARE takes $n parameters; DECLARE CURSOR cannot EXECUTE a
+        # prepared statement, so streaming uses the psycopg2 %s form instead
+        prepared_sql = render(active, lambda i: f"${i}")
+        cursor_sql = render(active, lambda i: "%s")
+        param_names = tuple(param for param, _ in active) + ('limit',)
+        variants[enabled] = (name, prepared_sql, cursor_sql, param_names)
+    return variants
+
+_QUERY_VARIANTS = _build_query_variants()
+
+# Rows fetched per round-trip when streaming query results
+_STREAM_ITERSIZE = 2000
+
+# PostgreSQL binary COPY framing: signature, flags, header extension length
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_TRAILER = struct.pack("!h", -1)
+_COPY_NULL = struct.pack("!i", -1)
+_COPY_FIELD_COUNT = struct.pack("!h", 9)
+_PG_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+def _json_bytes(value: Any) -> bytes:
+    try:
+        return orjson.dumps(value)
+    except orjson.JSONEncodeError:
+        # orjson rejects integers outside the 64-bit range; the stdlib encodes them
+        return json.dumps(value).encode("utf-8")
+
+def _json_dumps(value: Any) -> str:
+    return _json_bytes(value).decode("utf-8")
+
+def _localize(value: datetime, tz: tzinfo) -> datetime:
+    """Resolve a naive datetime in the session time zone the way PostgreSQL does"""
+    if value.tzinfo is not None:
+        return value
+    
+    # PostgreSQL gives a repeated wall time (clocks going back) the offset after
+    # the transition, and a skipped one the offset before it
+    aware = value.replace(tzinfo=tz, fold=1)
+    if aware.astimezone(timezone.utc).astimezone(tz).replace(tzinfo=None, fold=0) != value:
+        aware = value.replace(tzinfo=tz)
+    return aware
+
+def _copy_bytes(value: bytes) -> bytes:
+    return struct.pack("!i", len(value)) + value
+
+def _copy_float8(value: Optional[float]) -> bytes:
+    return _COPY_NULL if value is None else struct.pack("!id", 8, value)
+
+def _encode_copy_row(row: Tuple) -> bytes:
+    """Encode a prepared row as a binary COPY tuple"""
+    record_id, scan_time, instance_name, cf, span, sample_amount, rbw, vbw, extra_config = row
+    
+    # timestamptz is sent as microseconds since 2000-01-01 UTC
+    delta = scan_time - _PG_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    
+    return b"".join((
+        _COPY_FIELD_COUNT,
+        _copy_bytes(record_id.encode("utf-8")),
+        struct.pack("!iq", 8, micros),
+        _copy_bytes(instance_name.encode("utf-8")),
+        _copy_float8(cf),
+        _copy_float8(span),
+        _COPY_NULL if sample_amount is None else struct.pack("!ii", 4, sample_amount),
+        _copy_float8(rbw),
+        _copy_float8(vbw),
+        # jsonb binary format is a version byte followed by the JSON text
+        _COPY_NULL if extra_config is None else _copy_bytes(b"\x01" + _json_bytes(extra_config)),
+    ))
+
+class _PreparingConnection(PGConnection):
+    """psycopg2 connection that tracks its server-side prepared statements"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Prepared statements live for the session, so pooled reuse keeps them
+        self.prepared = set()
+        # Session TimeZone, resolved on first use
+        self.session_timezone = None
+
 class TimescaleDBManager:
     """TimescaleDB database manager for spectrum data"""
     
     def __init__(self):
         self.engine = None
         self.Session = None
+        self._pg_pool = None
+        self._pg_pool_lock = threading.Lock()
         self._initialize_connection()
     
     def _initialize_connection(self):
@@ -62,7 +216,10 @@ class TimescaleDBManager:
         -- Create hypertable for time-series optimization
         SELECT create_hypertable('spectrum_data', 'scan_time', 
                                  if_not_exists => TRUE,
-                                 chunk_time_interval => INTERVAL '1 day');
+                                 chunk_time_interval => CAST(:chunk_interval AS INTERVAL));
+        
+        -- Apply the configured interval to new chunks of an existing hypertable
+        SELECT set_chunk_time_interval('spectrum_data', CAST(:chunk_interval AS INTERVAL));
         
         -- Create indexes for better query performance
         CREATE INDEX IF NOT EXISTS idx_spectrum_instance_time 
@@ -77,96 +234,232 @@ class TimescaleDBManager:
         -- Create index on JSONB config field
         CREATE INDEX IF NOT EXISTS idx_spectrum_config_gin 
         ON spectrum_data USING GIN (config_extra);
+        
+        -- Daily per-instance rollup backing get_statistics(), with real-time
+        -- aggregation covering rows newer than the last materialization
+        CREATE MATERIALIZED VIEW IF NOT EXISTS spectrum_data_daily
+        WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+        SELECT time_bucket(INTERVAL '1 day', scan_time) AS bucket,
+               instance_name,
+               COUNT(*) AS record_count,
+               MIN(scan_time) AS earliest_scan,
+               MAX(scan_time) AS latest_scan
+        FROM spectrum_data
+        GROUP BY bucket, instance_name
+        WITH NO DATA;
+        
+        SELECT add_continuous_aggregate_policy('spectrum_data_daily',
+                                               start_offset => NULL,
+                                               end_offset => INTERVAL '1 hour',
+                                               schedule_interval => INTERVAL '1 hour',
+                                               if_not_exists => TRUE);
+        """
+        
+        # Columnar compression for historical chunks; segmenting by instance keeps
+        # per-analyzer range scans reading only their own compressed batches.
+        # Backfills upsert into chunks that are already compressed, so orderby
+        # carries the full (scan_time, id) key: each ON CONFLICT check can use
+        # the batch min/max metadata and decompress only the matching batch
+        # instead of the whole instance segment
+        enable_compression_sql = """
+        ALTER TABLE spectrum_data SET (
+            timescaledb.compress,
+            timescaledb.compress_segmentby = 'instance_name',
+            timescaledb.compress_orderby = 'scan_time DESC, id'
+        )
         """
         
+        compression_policy_sql = """
+        SELECT add_compression_policy('spectrum_data', CAST(:compress_after AS INTERVAL),
+                                      if_not_exists => TRUE)
+        """
+        
+        interval_params = {
+            'chunk_interval': db_config.chunk_time_interval,
+            'compress_after': db_config.compress_after,
+        }
+        
         try:
             with self.engine.connect() as conn:
                 # Execute each statement separately for better error handling
                 statements = [stmt.strip() for stmt in create_table_sql.split(';') if stmt.strip()]
                 for statement in statements:
                     if statement:
-                        conn.execute(text(statement))
+                        # Configured intervals are bound, never pasted into the SQL
+                        conn.execute(text(statement), interval_params)
                         conn.commit()
+                
+                # Compression settings cannot be re-applied once chunks are compressed
+                compression_enabled = conn.execute(text(
+                    "SELECT compression_enabled FROM timescaledb_information.hypertables "
+                    "WHERE hypertable_name = 'spectrum_data'"
+                )).scalar()
+                if not compression_enabled:
+                    conn.execute(text(enable_compression_sql))
+                conn.execute(text(compression_policy_sql), interval_params)
+                conn.commit()
             logger.info("Tables and hypertables created successfully")
         except Exception as e:
             logger.error(f"Failed to create tables: {e}")
             raise
     
+    def _get_pg_pool(self) -> ThreadedConnectionPool:
+        """Create the psycopg2 connection pool on first use"""
+        # Created lazily so importing this module never opens a connection
+        if self._pg_pool is None:
+            with self._pg_pool_lock:
+                if self._pg_pool is None:
+                    self._pg_pool = ThreadedConnectionPool(
+                        minconn=db_config.min_pool_size,
+                        maxconn=db_config.pool_size + db_config.max_overflow,
+                        host=db_config.host,
+                        port=db_config.port,
+                        database=db_config.database,
+                        user=db_config.username,
+                        password=db_config.password,
+                        connection_factory=_PreparingConnection
+                    )
+        return self._pg_pool
+    
     @contextmanager
     def get_connection(self):
-        """Get a raw psycopg2 connection for bulk operations"""
+        """Get a pooled raw psycopg2 connection for bulk operations"""
+        pool = None
         conn = None
         try:
-            conn = psycopg2.connect(
-                host=db_config.host,
-                port=db_config.port,
-                database=db_config.database,
-                user=db_config.username,
-                password=db_config.password
-            )
+            pool = self._get_pg_pool()
+            conn = pool.getconn()
             yield conn
         except Exception as e:
-            if conn:
+            if conn and not conn.closed:
                 conn.rollback()
             logger.error(f"Database connection error: {e}")
             raise
         finally:
             if conn:
-                conn.close()
+                # Broken connections are dropped instead of returned for reuse
+                pool.putconn(conn, close=bool(conn.closed))
+    
+    def close(self):
+        """Close pooled connections and dispose of the SQLAlchemy engine"""
+        with self._pg_pool_lock:
+            if self._pg_pool is not None:
+                self._pg_pool.closeall()
+                self._pg_pool = None
+        if self.engine is not None:
+            self.engine.dispose()
+    
+    def _execute_prepared(self, cursor, name: str, sql: str, params: Tuple = ()):
+        """Execute sql as a named prepared statement, preparing it once per connection"""
+        conn = cursor.connection
+        if name not in conn.prepared:
+            cursor.execute(f"PREPARE {name} AS {sql}")
+            conn.prepared.add(name)
+        
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
     
-    def insert_spectrum_data(self, data_list: List[SpectrumData]) -> int:
-        """Bulk insert spectrum data into TimescaleDB"""
+    def _session_timezone(self, conn) -> tzinfo:
+        """Return the connection's TimeZone setting as a tzinfo"""
+        if conn.session_timezone is None:
+            with conn.cursor() as cursor:
+                cursor.execute("SHOW timezone")
+                name = cursor.fetchone()[0]
+                try:
+                    conn.session_timezone = ZoneInfo(name)
+                except (ZoneInfoNotFoundError, ValueError):
+                    # Zone unknown to the client: use the server's current offset
+                    cursor.execute("SELECT EXTRACT(TIMEZONE FROM now())::INTEGER")
+                    conn.session_timezone = timezone(timedelta(seconds=cursor.fetchone()[0]))
+                    logger.warning(f"Unknown server time zone {name!r}, "
+                                   f"using fixed offset {conn.session_timezone}")
+        return conn.session_timezone
+    
+    def _prepare_row(self, data: SpectrumData, tz: tzinfo) -> Tuple:
+        """Flatten a SpectrumData record into a spectrum_data row"""
+        # Extract config info
+        config = data.config_info
+        
+        # Known fields map to typed columns; ConfigInfo keeps no other extras,
+        # so only extra_fields goes to config_extra (no per-row .dict() walk)
+        return (
+            data.id,
+            # Naive scan times keep the server-side meaning they had as text
+            # parameters: wall time in the session TimeZone
+            _localize(data.scan_datetime, tz),
+            data.instance_name,
+            config.cf,
+            config.span,
+            config.sample_amount,
+            config.rbw,
+            config.vbw,
+            config.extra_fields or None
+        )
+    
+    def _copy_binary_batch(self, cursor, rows: Iterable[Tuple]):
+        """Stream rows into the session staging table with COPY BINARY"""
+        cursor.execute(_CREATE_STAGING_SQL)
+        
+        buf = io.BytesIO()
+        buf.write(_COPY_HEADER)
+        for row in rows:
+            buf.write(_encode_copy_row(row))
+        buf.write(_COPY_TRAILER)
+        buf.seek(0)
+        
+        cursor.copy_expert(_COPY_STAGING_SQL, buf)
+    
+    def insert_spectrum_data(self, data_list: List[SpectrumData], use_copy: bool = True) -> int:
+        """Bulk insert spectrum data into TimescaleDB
+        
+        By default rows are loaded with COPY BINARY into a temporary staging
+        table and merged with a single upsert. Set use_copy=False to fall back
+        to a multi-row INSERT via execute_values.
+        """
         if not data_list:
             return 0
         
-        insert_sql = """
-        INSERT INTO spectrum_data 
-        (id, scan_time, instance_name, cf, span, sample_amount, rbw, vbw, config_extra)
+        insert_sql = f"""
+        INSERT INTO spectrum_data ({_UPSERT_COLUMNS})
         VALUES %s
-        ON CONFLICT (scan_time, id) DO UPDATE SET
-            instance_name = EXCLUDED.instance_name,
-            cf = EXCLUDED.cf,
-            span = EXCLUDED.span,
-            sample_amount = EXCLUDED.sample_amount,
-            rbw = EXCLUDED.rbw,
-            vbw = EXCLUDED.vbw,
-            config_extra = EXCLUDED.config_extra
+        {_ON_CONFLICT_SQL}
         """
         
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    # Prepare data for insertion
-                    values = []
+                    # A repeated (scan_time, id) would make the single upsert affect
+                    # the same row twice and fail the whole batch; keep the last one
+                    tz = self._session_timezone(conn)
+                    unique_rows = {}
                     for data in data_list:
-                        # Extract config info
-                        config = data.config_info
-                        
-                        # Prepare extra config fields (excluding known fields)
-                        extra_config = {
-                            k: v for k, v in config.dict().items() 
-                            if k not in ['cf', 'span', 'sample_amount', 'rbw', 'vbw', 'extra_fields']
-                        }
-                        if config.extra_fields:
-                            extra_config.update(config.extra_fields)
-                        
-                        values.append((
-                            data.id,
-                            data.scan_datetime,
-                            data.instance_name,
-                            config.cf,
-                            config.span,
-                            config.sample_amount,
-                            config.rbw,
-                            config.vbw,
-                            json.dumps(extra_config) if extra_config else None
-                        ))
+                        row = self._prepare_row(data, tz)
+                        unique_rows[(row[1], row[0])] = row
+                    
+                    # Time-ordered rows fill one chunk at a time instead of
+                    # hopping between chunks (and their indexes) row by row
+                    rows = sorted(unique_rows.values(), key=_ROW_ORDER)
+                    
+                    if use_copy:
+                        self._copy_binary_batch(cursor, rows)
+                        self._execute_prepared(cursor, "spectrum_merge_staging", _MERGE_STAGING_SQL)
+                    else:
+                        # One statement per UTC day keeps each INSERT within few chunks
+                        for _, day_rows in itertools.groupby(rows, key=lambda row: row[1].astimezone(timezone.utc).date()):
+                            values = (
+                                row[:-1] + (Json(row[-1], dumps=_json_dumps) if row[-1] else None,)
+                                for row in day_rows
+                            )
+                            execute_values(cursor, insert_sql, values, template=None,
+                                           page_size=db_config.insert_page_size)
                     
-                    # Bulk insert with conflict resolution
-                    execute_values(cursor, insert_sql, values, template=None)
+                    # Staging rows are discarded on commit (ON COMMIT DELETE ROWS)
                     conn.commit()
                     
-                    inserted_count = len(values)
+                    inserted_count = len(rows)
                     logger.info(f"Successfully inserted {inserted_count} spectrum data records")
                     return inserted_count
                     
@@ -181,46 +474,94 @@ class TimescaleDBManager:
                           limit: int = 1000) -> List[Dict[str, Any]]:
         """Query spectrum data with optional filters"""
         
-        base_query = """
-        SELECT id, scan_time, instance_name, cf, span, sample_amount, 
-               rbw, vbw, config_extra, created_at
-        FROM spectrum_data
-        WHERE 1=1
-        """
-        
-        params = {}
-        
-        if start_time:
-            base_query += " AND scan_time >= %(start_time)s"
-            params['start_time'] = start_time
-            
-        if end_time:
-            base_query += " AND scan_time <= %(end_time)s"
-            params['end_time'] = end_time
-            
-        if instance_name:
-            base_query += " AND instance_name = %(instance_name)s"
-            params['instance_name'] = instance_name
-        
-        base_query += " ORDER BY scan_time DESC LIMIT %(limit)s"
-        params['limit'] = limit
+        # Each filter combination has a fixed, prepared statement
+        name, sql, _, params = self._resolve_query(start_time, end_time, instance_name, limit)
         
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    cursor.execute(base_query, params)
-                    results = cursor.fetchall()
+                    self._execute_prepared(cursor, name, sql, params)
                     
-                    # Convert to list of dictionaries
-                    return [dict(row) for row in results]
+                    # RealDictCursor rows are already dicts; return them without copying
+                    return cursor.fetchall()
                     
         except Exception as e:
             logger.error(f"Failed to query spectrum data: {e}")
             raise
     
+    def iter_spectrum_data(self, 
+                           start_time: Optional[datetime] = None,
+                           end_time: Optional[datetime] = None,
+                           instance_name: Optional[str] = None,
+                           limit: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream spectrum data with optional filters through a server-side cursor
+        
+        Rows are fetched in pages of _STREAM_ITERSIZE, so memory stays flat for
+        large limits. The pooled connection is held until the iterator is
+        exhausted or closed.
+        """
+        _, _, sql, params = self._resolve_query(start_time, end_time, instance_name, limit)
+        
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(name="spectrum_stream", cursor_factory=RealDictCursor) as cursor:
+                    cursor.itersize = _STREAM_ITERSIZE
+                    cursor.execute(sql, params)
+                    yield from cursor
+                    
+        except Exception as e:
+            logger.error(f"Failed to stream spectrum data: {e}")
+            raise
+    
+    def _resolve_query(self, start_time: Optional[datetime], end_time: Optional[datetime],
+                       instance_name: Optional[str], limit: int) -> Tuple[str, str, str, Tuple]:
+        """Pick the query variant for the given filters and order its parameters"""
+        values = {
+            'start_time': start_time,
+            'end_time': end_time,
+            'instance_name': instance_name,
+            'limit': limit,
+        }
+        key = tuple(bool(values[param]) for param, _ in _QUERY_FILTERS)
+        name, prepared_sql, cursor_sql, param_names = _QUERY_VARIANTS[key]
+        return name, prepared_sql, cursor_sql, tuple(values[param] for param in param_names)
+    
+    def refresh_statistics(self):
+        """Refresh the statistics rollup after loading historical data"""
+        # Backfilled rows older than the last materialization are only picked up
+        # by a refresh; CALL cannot run inside a transaction block
+        try:
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                # Databases set up before the rollup existed keep working without it;
+                # get_statistics() falls back to scanning spectrum_data
+                rollup_exists = conn.execute(text(
+                    "SELECT to_regclass('spectrum_data_daily') IS NOT NULL"
+                )).scalar()
+                if not rollup_exists:
+                    logger.warning("Statistics rollup not found, skipping refresh "
+                                   "(run setup to create it)")
+                    return
+                conn.execute(text("CALL refresh_continuous_aggregate('spectrum_data_daily', NULL, NULL)"))
+            logger.info("Statistics rollup refreshed")
+        except Exception as e:
+            logger.error(f"Failed to refresh statistics: {e}")
+            raise
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
+        # Served from the daily rollup instead of scanning every chunk
         stats_query = """
+        SELECT 
+            COALESCE(SUM(record_count), 0)::BIGINT as total_records,
+            COUNT(DISTINCT instance_name) as unique_instances,
+            MIN(earliest_scan) as earliest_scan,
+            MAX(latest_scan) as latest_scan,
+            COUNT(DISTINCT bucket) as unique_days
+        FROM spectrum_data_daily
+        """
+        
+        # Used until setup has created the rollup on an existing database
+        fallback_stats_query = """
         SELECT 
             COUNT(*) as total_records,
             COUNT(DISTINCT instance_name) as unique_instances,
@@ -233,7 +574,11 @@ class TimescaleDBManager:
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    cursor.execute(stats_query)
+                    try:
+                        self._execute_prepared(cursor, "spectrum_statistics", stats_query)
+                    except psycopg2.errors.UndefinedTable:
+                        conn.rollback()
+                        cursor.execute(fallback_stats_query)
                     result = cursor.fetchone()
                     return dict(result) if result else {}
                     
@@ -242,4 +587,5 @@ class TimescaleDBManager:
             raise
 
 # Global database manager instance
-db_manager = TimescaleDBManager()
\ No newline at end of file
+db_manager = TimescaleDBManager()
+atexit.register(db_manager.close)
\ No newline at end of file
@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field, validator
-import json
 
 class ConfigInfo(BaseModel):
     """Configuration information for spectrum scan"""
@@ -1,7 +1,12 @@
 import json
 import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Generator, Dict, Any
+from typing import Generator, Dict, Any, List
+import orjson
 from tqdm import tqdm
 import click
 
@@ -12,6 +17,19 @@ from database import db_manager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# orjson turns integers outside the int64/uint64 range into floats. Any digit
+# run of 19+ covers both ends (uint64 max has 20 digits, int64 min has 19), so
+# such lines are parsed by the stdlib instead and their values are kept exactly
+_LONG_NUMBER = re.compile(rb"\d{19,}")
+
+# Default parallel file workers; ingest scales with concurrent COPY streams
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+def _migrate_file_worker(file_path: str, batch_size: int) -> int:
+    """Migrate one file in a worker process using its own database connections"""
+    # Workers share the terminal; the parent reports progress per file instead
+    return NDJSONMigrator(batch_size=batch_size).migrate_file(Path(file_path), show_progress=False)
+
 class NDJSONMigrator:
     """Migrates NDJSON files to TimescaleDB"""
     
@@ -21,15 +39,25 @@ class NDJSONMigrator:
     def read_ndjson_file(self, file_path: Path) -> Generator[Dict[str, Any], None, None]:
         """Read NDJSON file line by line"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
+            # Read raw bytes; orjson parses UTF-8 directly without a str decode
+            with open(file_path, 'rb') as file:
                 for line_num, line in enumerate(file, 1):
                     line = line.strip()
                     if not line:
                         continue
                     
+                    if not _LONG_NUMBER.search(line):
+                        try:
+                            yield orjson.loads(line)
+                            continue
+                        except orjson.JSONDecodeError:
+                            pass
+                    
+                    # orjson rejects NaN/Infinity, which json.dumps writes by
+                    # default; the stdlib parser accepts them
                     try:
                         yield json.loads(line)
-                    except json.JSONDecodeError as e:
+                    except (json.JSONDecodeError, UnicodeDecodeError) as e:
                         logger.warning(f"Invalid JSON on line {line_num} in {file_path}: {e}")
                         continue
                         
@@ -63,7 +91,7 @@ class NDJSONMigrator:
             logger.error(f"Error parsing spectrum data: {e}, Data: {raw_data}")
             raise
     
-    def migrate_file(self, file_path: Path) -> int:
+    def migrate_file(self, file_path: Path, show_progress: bool = True) -> int:
         """Migrate single NDJSON file to TimescaleDB"""
         logger.info(f"Starting migration of file: {file_path}")
         
@@ -73,24 +101,27 @@ class NDJSONMigrator:
         
         try:
             # Count total lines for progress bar
-            total_lines = sum(1 for line in open(file_path, 'r', encoding='utf-8') if line.strip())
+            total_lines = None
+            if show_progress:
+                total_lines = sum(1 for line in open(file_path, 'r', encoding='utf-8') if line.strip())
             
-            with tqdm(total=total_lines, desc=f"Migrating {file_path.name}") as pbar:
+            with tqdm(total=total_lines, desc=f"Migrating {file_path.name}",
+                      disable=not show_progress) as pbar:
                 for raw_data in self.read_ndjson_file(file_path):
                     try:
                         spectrum_data = self.parse_spectrum_data(raw_data)
                         batch.append(spectrum_data)
                         total_processed += 1
-                        
-                        # Process batch when it reaches batch_size
-                        if len(batch) >= self.batch_size:
-                            inserted = db_manager.insert_spectrum_data(batch)
-                            total_inserted += inserted
-                            batch = []
-                            
                     except Exception as e:
                         logger.warning(f"Skipping invalid record: {e}")
                     
+                    # Process batch when it reaches batch_size; a failed insert
+                    # fails the file, like the remaining batch below
+                    if len(batch) >= self.batch_size:
+                        inserted = db_manager.insert_spectrum_data(batch)
+                        total_inserted += inserted
+                        batch = []
+                    
                     pbar.update(1)
                 
                 # Process remaining batch
@@ -105,26 +136,55 @@ class NDJSONMigrator:
             logger.error(f"Migration failed for file {file_path}: {e}")
             raise
     
-    def migrate_directory(self, directory_path: Path, pattern: str = "*.ndjson") -> int:
+    def migrate_directory(self, directory_path: Path, pattern: str = "*.ndjson",
+                          workers: int = 1) -> int:
         """Migrate all NDJSON files in a directory"""
         logger.info(f"Starting migration of directory: {directory_path}")
         
-        ndjson_files = list(directory_path.glob(pattern))
+        # Name order usually follows capture time, keeping writes on recent chunks
+        ndjson_files = sorted(directory_path.glob(pattern))
         if not ndjson_files:
             logger.warning(f"No NDJSON files found in {directory_path} with pattern {pattern}")
             return 0
         
+        if workers > 1 and len(ndjson_files) > 1:
+            total_inserted = self._migrate_files_parallel(ndjson_files, workers)
+        else:
+            total_inserted = 0
+            
+            for file_path in ndjson_files:
+                try:
+                    inserted = self.migrate_file(file_path)
+                    total_inserted += inserted
+                except Exception as e:
+                    logger.error(f"Failed to migrate {file_path}: {e}")
+                    continue
+        
+        logger.info(f"Directory migration completed. Total inserted: {total_inserted}")
+        return total_inserted
+    
+    def _migrate_files_parallel(self, file_paths: List[Path], workers: int) -> int:
+        """Migrate files concurrently, one worker process per file"""
         total_inserted = 0
         
-        for file_path in ndjson_files:
-            try:
-                inserted = self.migrate_file(file_path)
-                total_inserted += inserted
-            except Exception as e:
-                logger.error(f"Failed to migrate {file_path}: {e}")
-                continue
+        # spawn gives each worker a fresh connection pool (and matches Windows)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(file_paths)),
+                                 mp_context=context) as executor:
+            futures = {
+                executor.submit(_migrate_file_worker, str(file_path), self.batch_size): file_path
+                for file_path in file_paths
+            }
+            with tqdm(total=len(futures), desc="Migrating files", unit="file") as pbar:
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        total_inserted += future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to migrate {file_path}: {e}")
+                    pbar.set_postfix(inserted=total_inserted)
+                    pbar.update(1)
         
-        logger.info(f"Directory migration completed. Total inserted: {total_inserted}")
         return total_inserted
 
 @click.command()
@@ -134,9 +194,11 @@ class NDJSONMigrator:
               help='Number of records to process in each batch')
 @click.option('--pattern', '-p', default="*.ndjson", 
               help='File pattern to match when input is a directory')
+@click.option('--workers', '-w', default=DEFAULT_WORKERS, 
+              help='Number of files to migrate in parallel when input is a directory')
 @click.option('--setup-db', is_flag=True, 
               help='Setup database tables before migration')
-def migrate_ndjson(input_path: str, batch_size: int, pattern: str, setup_db: bool):
+def migrate_ndjson(input_path: str, batch_size: int, pattern: str, workers: int, setup_db: bool):
     """Migrate NDJSON files to TimescaleDB"""
     
     input_path = Path(input_path)
@@ -164,18 +226,28 @@ def migrate_ndjson(input_path: str, batch_size: int, pattern: str, setup_db: boo
             total_inserted = migrator.migrate_file(input_path)
         else:
             # Migrate directory
-            total_inserted = migrator.migrate_directory(input_path, pattern)
+            total_inserted = migrator.migrate_directory(input_path, pattern, workers=workers)
         
         click.echo(f"Migration completed successfully. Total records inserted: {total_inserted}")
         
-        # Show statistics
+    except Exception as e:
+        click.echo(f"Migration failed: {e}", err=True)
+        return
+    
+    # Rows are already committed; a failed refresh only leaves stats stale
+    try:
+        db_manager.refresh_statistics()
+    except Exception as e:
+        click.echo(f"Warning: statistics refresh failed, stats may be stale: {e}", err=True)
+    
+    # Show statistics
+    try:
         stats = db_manager.get_statistics()
         click.echo("\nDatabase Statistics:")
         for key, value in stats.items():
             click.echo(f"  {key}: {value}")
-            
     except Exception as e:
-        click.echo(f"Migration failed: {e}", err=True)
+        click.echo(f"Failed to get statistics: {e}", err=True)
 
 if __name__ == "__main__":
     migrate_ndjson()
\ No newline at end of file
@@ -12,7 +12,7 @@ This script demonstrates the complete workflow:
 import sys
 import logging
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -67,6 +67,12 @@ def main():
             except Exception as e:
                 print(f"❌ Migration failed: {e}")
                 return False
+            
+            # Rows are already committed; a failed refresh only leaves stats stale
+            try:
+                db_manager.refresh_statistics()
+            except Exception as e:
+                print(f"⚠️  Statistics refresh failed, stats may be stale: {e}")
         else:
             print("⚠️  Step 3: No sample data found (sample_data.ndjson)")
             print("   You can create your own NDJSON files to migrate")
@@ -77,7 +83,7 @@ def main():
         print("🔍 Step 4: Querying recent data...")
         try:
             # Get data from the last 7 days
-            end_time = datetime.now()
+            end_time = datetime.now(timezone.utc)
             start_time = end_time - timedelta(days=7)
             
             results = db_manager.query_spectrum_data(